@@ -0,0 +1,75 @@
+"""
+JIT-compiled micro-kernels for the placement hot path.
+
+The rejection-sampling loops in generate.py spend most of their time in tiny
+arithmetic bodies where the Python interpreter overhead dominates. When numba
+is available these kernels are compiled to native code with @njit and warmed
+once at import so the JIT cost is paid up front; otherwise pure NumPy/Python
+fallbacks with identical signatures are used.
+"""
+
+import math
+import random
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _random_xy_in_disk(radius):
+    """
+    Draws a random XY offset uniformly distributed inside a disk.
+
+    :param radius: The radius of the disk.
+    :return: A tuple (x, y) with the sampled offset.
+    """
+
+    angle = random.uniform(0, 2 * math.pi)
+    distance = random.uniform(0, radius)
+    return distance * math.cos(angle), distance * math.sin(angle)
+
+
+def _aabb_overlap_mask(q_min, q_max, bb_min, bb_max):
+    """
+    Tests one query bounding box against N bounding boxes at once.
+
+    :param q_min: Minimum corner of the query box as an array of shape (3,).
+    :param q_max: Maximum corner of the query box.
+    :param bb_min: Minimum corners of the other boxes as an array of shape (N, 3).
+    :param bb_max: Maximum corners of the other boxes.
+    :return: A boolean array of shape (N,) marking the overlapping boxes.
+    """
+
+    return np.all(q_min <= bb_max, axis=1) & np.all(q_max >= bb_min, axis=1)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def random_xy_in_disk(radius):
+        angle = np.random.uniform(0, 2 * np.pi)
+        distance = np.random.uniform(0, radius)
+        return distance * np.cos(angle), distance * np.sin(angle)
+
+    @njit(cache=True)
+    def aabb_overlap_mask(q_min, q_max, bb_min, bb_max):
+        n = bb_min.shape[0]
+        mask = np.empty(n, np.bool_)
+        for i in range(n):
+            mask[i] = (q_min[0] <= bb_max[i, 0] and q_max[0] >= bb_min[i, 0] and
+                       q_min[1] <= bb_max[i, 1] and q_max[1] >= bb_min[i, 1] and
+                       q_min[2] <= bb_max[i, 2] and q_max[2] >= bb_min[i, 2])
+        return mask
+
+    # Warm the kernels once at import so the JIT cost is not paid inside the
+    # placement loops
+    random_xy_in_disk(1.0)
+    _warm = np.zeros(3, dtype=np.float32)
+    _warm_rows = np.zeros((1, 3), dtype=np.float32)
+    aabb_overlap_mask(_warm, _warm, _warm_rows, _warm_rows)
+else:
+    random_xy_in_disk = _random_xy_in_disk
+    aabb_overlap_mask = _aabb_overlap_mask
@@ -1,44 +1,84 @@
 import ast
 import re
 from collections import defaultdict, deque
-from math import cos, sin, pi
+import numpy as np
+from mathutils.bvhtree import BVHTree
 from utils import debug
 
 import zendo_objects
+from _hotpath import aabb_overlap_mask, random_xy_in_disk
+from placement import PoissonDiskSampler, object_spacing
 from structure import *
 
+# Pattern for the Prolog item strings, compiled once instead of per item
+_ITEM_RE = re.compile(r"item\((\d+),\s*(\w+),\s*(\w+),\s*(\w+),\s*(.+)\)")
+
+# Maps the shape names used in the instructions to their ZendoObject classes
+_SHAPE_CTOR = {
+    'block': zendo_objects.Block,
+    'wedge': zendo_objects.Wedge,
+    'pyramid': zendo_objects.Pyramid,
+}
+
+
+def build_scene_bvh():
+    """
+    Builds a single BVH tree from the meshes of all Zendo objects in the scene.
+
+    :return: A tuple (tree, poly_owner) where tree is a BVHTree over all object polygons
+             and poly_owner maps each polygon index back to its ZendoObject.
+    """
+
+    vertices = []
+    polygons = []
+    poly_owner = []
+
+    for zendo_obj in ZendoObject.instances:
+        mesh = zendo_obj.obj.data
+        offset = len(vertices)
+
+        # Transform all vertices to world space in one batched matrix multiplication
+        local_coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", local_coords)
+        local_coords = local_coords.reshape(-1, 3)
+        matrix = np.array(zendo_obj.obj.matrix_world)
+        world_coords = local_coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+        vertices.extend(map(tuple, world_coords))
+        for polygon in mesh.polygons:
+            polygons.append(tuple(i + offset for i in polygon.vertices))
+            poly_owner.append(zendo_obj)
+
+    return BVHTree.FromPolygons(vertices, polygons), poly_owner
+
 
 def check_pointing(observer: ZendoObject):
     """
     Determines which objects the given Zendo object is pointing toward.
 
+    All rays are cast against one precomputed BVH of the Zendo object meshes
+    instead of repeatedly traversing the scene through bpy.context.scene.ray_cast.
+
     :param observer: The ZendoObject to evaluate.
     :return: A list of ZendoObjects that the observer is pointing at.
     """
 
-    bpy.context.view_layer.update()
+    zendo_objects.ensure_view_layer_updated()
+    tree, poly_owner = build_scene_bvh()
     results = []
 
     for origin, direction in observer.get_rays():
-        ray_path = [origin.copy()]
         direction = direction.normalized()
         current_location = origin.copy()
-        # origin.z = 0.001 # Ground offset because raycasting on 0 Z coordinate doesn't work reliably
-        hit_location = origin.copy()
         while True:
-            hit, hit_location, _, _, obj, _ = bpy.context.scene.ray_cast(
-                bpy.context.view_layer.depsgraph, current_location, direction
-            )
-            if not hit:
+            hit_location, _, poly_index, _ = tree.ray_cast(current_location, direction)
+            if hit_location is None:
                 break
-            else:
-                zendo_obj = zendo_objects.get_from_blender_obj(obj)
-                if zendo_obj is not None and zendo_obj not in results and zendo_obj is not observer:
-                    ray_path.append(hit_location)
-                    results.append(zendo_obj)
-                current_location = hit_location + direction * 0.01
-                hit_location *= 1.01
-
+            zendo_obj = poly_owner[poly_index]
+            if zendo_obj is not observer and zendo_obj not in results:
+                results.append(zendo_obj)
+            # Advance the origin slightly past the hit to collect all intersections along the ray
+            current_location = hit_location + direction * 1e-4
     return results
 
 
@@ -52,40 +92,27 @@ def check_collision(zendo_object: ZendoObject, omit: ZendoObject = None, margin:
     :return: A list of ZendoObjects that are colliding with the given object.
     """
 
-    # Ensure the scene is updated
-    bpy.context.view_layer.update()
+    # Ensure the scene is updated if any object moved since the last evaluation
+    zendo_objects.ensure_view_layer_updated()
+
+    # All other objects that take part in the collision check
+    others = [o for o in ZendoObject.instances if o is not zendo_object and o is not omit]
+    if not others:
+        return []
 
     # Compute the bounding box of the object, including collision margin
-    obj_bb = [zendo_object.obj.matrix_world @ Vector(corner) for corner in zendo_object.obj.bound_box]
-    obj_bb_min = Vector((min(v.x for v in obj_bb), min(v.y for v in obj_bb), min(v.z for v in obj_bb))) - Vector(
-        (margin,) * 3)
-    obj_bb_max = Vector((max(v.x for v in obj_bb), max(v.y for v in obj_bb), max(v.z for v in obj_bb))) + Vector(
-        (margin,) * 3)
-
-    # List to store objects colliding with the given object
-    colliding_objects = []
-
-    # Iterate over all other objects in the scene
-    for other_obj in ZendoObject.instances:
-        if other_obj is zendo_object or other_obj is omit:
-            continue  # Skip checking collision with itself or omit object
-
-        # Get the world-space bounding box of the other object, including collision margin
-        other_bb = [other_obj.obj.matrix_world @ Vector(corner) for corner in other_obj.obj.bound_box]
-        other_bb_min = Vector(
-            (min(v.x for v in other_bb), min(v.y for v in other_bb), min(v.z for v in other_bb))) - Vector(
-            (margin,) * 3)
-        other_bb_max = Vector(
-            (max(v.x for v in other_bb), max(v.y for v in other_bb), max(v.z for v in other_bb))) + Vector(
-            (margin,) * 3)
-
-        # Check for overlap in bounding box (AABB collision detection)
-        if (obj_bb_min.x <= other_bb_max.x and obj_bb_max.x >= other_bb_min.x and
-                obj_bb_min.y <= other_bb_max.y and obj_bb_max.y >= other_bb_min.y and
-                obj_bb_min.z <= other_bb_max.z and obj_bb_max.z >= other_bb_min.z):
-            colliding_objects.append(other_obj)
-
-    return colliding_objects
+    obj_bb_min, obj_bb_max = zendo_object.get_aabb()
+    obj_bb_min = obj_bb_min - margin
+    obj_bb_max = obj_bb_max + margin
+
+    # Stack the cached bounding boxes of the other objects into (N, 3) arrays, including collision margin
+    other_bb_min = np.stack([o.get_aabb()[0] for o in others]) - margin
+    other_bb_max = np.stack([o.get_aabb()[1] for o in others]) + margin
+
+    # Check for overlap in bounding box (AABB collision detection) over all objects at once
+    mask = aabb_overlap_mask(obj_bb_min, obj_bb_max, other_bb_min, other_bb_max)
+
+    return [others[i] for i in np.nonzero(mask)[0]]
 
 
 def get_random_position(anchor, radius):
@@ -97,67 +124,12 @@ def get_random_position(anchor, radius):
     :return: A Vector representing the random position.
     """
 
-    angle = random.uniform(0, 2 * pi)
-    # Random distance from the center (with uniform distribution in area)
-    distance = random.uniform(0, radius)
-    # Convert polar coordinates to Cartesian coordinates
-    x = distance * cos(angle)
-    y = distance * sin(angle)
-
+    x, y = random_xy_in_disk(radius)
     random_position = Vector(anchor) + Vector((x, y, 0))
 
     return random_position
 
 
-def get_grounded(instructions):
-    """
-    Extracts and sorts objects that have the 'grounded' action from the given instructions.
-
-    :param instructions: A list of dictionaries representing object instructions.
-    :return: A sorted list of grounded objects based on their 'id' value.
-    """
-
-    grounded_objects = [i for i in instructions if i.get('action') == 'grounded']
-    grounded_objects = sorted(grounded_objects, key=lambda x: x['id'])
-    return grounded_objects
-
-
-def get_relations(instructions):
-    """
-    Extracts and sorts objects based on their dependencies in relation to other objects.
-
-    :param instructions: A list of dictionaries representing object instructions.
-    :return: A sorted list of objects based on dependency resolution.
-    """
-
-    related_objects = [i for i in instructions if i.get('action') != 'grounded']
-
-    dependencies = defaultdict(list)
-    id_to_object = {obj['id']: obj for obj in instructions}
-    dependents_count = {obj['id']: 0 for obj in instructions}
-
-    for obj in instructions:
-        action = obj['action']
-        if '(' in action and ')' in action:
-            dep_id = int(action.split('(')[-1].split(')')[0])
-            dependencies[dep_id].append(obj['id'])
-            dependents_count[obj['id']] += 1
-
-    # Topological sorting
-    sorted_objects = []
-    queue = deque([obj_id for obj_id, count in dependents_count.items() if count == 0])
-
-    while queue:
-        current = queue.popleft()
-        sorted_objects.append(id_to_object[current])
-        for dependent in dependencies[current]:
-            dependents_count[dependent] -= 1
-            if dependents_count[dependent] == 0:
-                queue.append(dependent)
-
-    return sorted_objects
-
-
 def get_free_face(args, obj: ZendoObject):
     """
     Determines a free face of a given Zendo object.
@@ -205,8 +177,6 @@ def generate_creation(args, instruction, collection):
     shape = instruction['shape']
     color = instruction['color']
     orientation = instruction['orientation']
-    action = instruction['action']
-    # name = f"{idx}_{shape}"
 
     if orientation == 'vertical':
         if shape == 'block':
@@ -214,12 +184,7 @@ def generate_creation(args, instruction, collection):
         else:
             orientation = 'upright'
 
-    if shape == 'block':
-        obj = zendo_objects.Block(args, idx, color, orientation)
-    elif shape == 'wedge':
-        obj = zendo_objects.Wedge(args, idx, color, orientation)
-    elif shape == 'pyramid':
-        obj = zendo_objects.Pyramid(args, idx, color, orientation)
+    obj = _SHAPE_CTOR[shape](args, idx, color, orientation)
 
     collection.objects.link(obj.obj)
 
@@ -250,30 +215,59 @@ def generate_structure(args, items: list[str], collection, attempt: int = 1):
     placement_attempts = args.placement_attempts
     los_threshold = args.los_threshold
 
-    # items = prolog_string
+    # Parse the item strings and collect dependency information in a single pass
     instructions = []
+    id_to_instruction = {}
+    dependencies = defaultdict(list)
+    dependents_count = {}
     for item in items:
-        match = re.match(r"item\((\d+),\s*(\w+),\s*(\w+),\s*(\w+),\s*(.+)\)", item)
+        match = _ITEM_RE.match(item)
         if match:
             item_id = int(match.group(1))
-            color = match.group(2)
-            shape = match.group(3)
-            orientation = match.group(4)
             action = match.group(5)
-            instructions.append({
+            instruction = {
                 'id': item_id,
-                'color': color,
-                'shape': shape,
-                'orientation': orientation,
+                'color': match.group(2),
+                'shape': match.group(3),
+                'orientation': match.group(4),
                 'action': action
-            })
+            }
+            instructions.append(instruction)
+            id_to_instruction[item_id] = instruction
+            if '(' in action and ')' in action:
+                dep_id = int(action.split('(')[-1].split(')')[0])
+                dependencies[dep_id].append(item_id)
+                dependents_count[item_id] = 1
+            else:
+                dependents_count[item_id] = 0
+
+    # Topological sorting
+    related_objects = []
+    queue = deque(obj_id for obj_id, count in dependents_count.items() if count == 0)
+    while queue:
+        current = queue.popleft()
+        related_objects.append(id_to_instruction[current])
+        for dependent in dependencies[current]:
+            dependents_count[dependent] -= 1
+            if dependents_count[dependent] == 0:
+                queue.append(dependent)
 
-    related_objects = get_relations(instructions)
     if len(related_objects) != len(instructions):
         raise Exception(f"Rule not resolvable!\n {instructions}")
 
     integrity = True
 
+    # Poisson-disk sampler shared by all placements of this scene; created once the
+    # first object is placed so its spacing can be derived from an actual object
+    sampler = None
+
+    def register_placement(placed_object):
+        nonlocal sampler
+        if sampler is None:
+            sampler = PoissonDiskSampler(placement_radius, anchor_position,
+                                         object_spacing(placed_object, collision_margin))
+        sampler.register(placed_object.get_position())
+
     # Place related objects
     for instruction in related_objects:
         idx = related_objects.index(instruction)
@@ -290,15 +284,18 @@ def generate_structure(args, items: list[str], collection, attempt: int = 1):
                     debug(f"Exceeded maximum placement attempts!")
                     integrity = False
                     break
-                # Try to place the object at a random position
+                # Try to place the object at a Poisson-disk candidate position
                 if idx == 0:
                     pos = Vector(anchor_position)
                 else:
-                    pos = get_random_position(anchor=anchor_position, radius=placement_radius)
+                    pos = sampler.sample() if sampler is not None else None
+                    if pos is None:
+                        pos = get_random_position(anchor=anchor_position, radius=placement_radius)
 
                 current_object.set_position_xy(pos)
                 colliding_objects = check_collision(current_object, margin=collision_margin)
                 if len(colliding_objects) == 0:
+                    register_placement(current_object)
                     break
                 else:
                     attempts += 1
@@ -323,21 +320,23 @@ def generate_structure(args, items: list[str], collection, attempt: int = 1):
                     colliding_objects = check_collision(current_object, target)
                     if len(colliding_objects) == 0:
                         target.set_touching(face, current_object)
-                        axis, direction = face_map[face]
-                        object_1_face = list(face_map.keys())[list(face_map.values()).index((axis, direction * (-1)))]
-                        current_object.set_touching(object_1_face, target)
+                        current_object.set_touching(opposite_face[face], target)
+                        register_placement(current_object)
                         break
                     else:
                         attempts += 1
                         debug(f"{current_object.get_namestring()} colliding with {[o.get_namestring() for o in colliding_objects]}!")
 
                 elif relation_type == 'pointing':
-                    pos = get_random_position(anchor=anchor_position, radius=placement_radius)
+                    pos = sampler.sample() if sampler is not None else None
+                    if pos is None:
+                        pos = get_random_position(anchor=anchor_position, radius=placement_radius)
                     current_object.set_position_xy(pos)
                     pointing(current_object, target)
                     colliding_objects = check_collision(current_object, margin=collision_margin)
                     pointing_objects = check_pointing(current_object)
                     if len(colliding_objects) == 0 and len(pointing_objects) == 1:
+                        register_placement(current_object)
                         break
                     else:
                         attempts += 1
@@ -375,9 +374,7 @@ def generate_structure(args, items: list[str], collection, attempt: int = 1):
     debug(f"Integrity: {integrity}")
 
     if not integrity:
-        for obj in collection.objects:
-            bpy.data.objects.remove(obj, do_unlink=True)
-        ZendoObject.instances.clear()
+        zendo_objects.clear_scene(collection)
 
         generate_structure(args, items, collection, attempt=attempt + 1)
 
@@ -390,11 +387,15 @@ def check_scene_occlusion(threshold):
     :return: True if the occlusion exceeds the threshold, otherwise False.
     """
 
+    zendo_objects.ensure_view_layer_updated()
     cam = bpy.data.objects["Camera.001"]
     camera_loc = cam.location
+    # Generated objects are named "<idx>_<shape>", so a single tuple-prefix
+    # check on the part after the index replaces three substring scans
+    shape_prefixes = ("Pyramid", "Wedge", "Block")
     targets = [
         o for o in bpy.data.objects
-        if o.type == 'MESH' and any(k in o.name for k in ["Pyramid", "Wedge", "Block"])
+        if o.type == 'MESH' and o.name.partition("_")[2].startswith(shape_prefixes)
     ]
 
     for obj in targets:
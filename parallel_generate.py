@@ -0,0 +1,107 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+import yaml
+
+
+def main(conf):
+    """
+    Spawns multiple worker processes that generate disjoint shards of the
+    dataset in parallel, then concatenates their ground truth CSV files. With
+    --batch the workers re-render saved .blend files through render_batch.py
+    instead of generating new scenes.
+
+    Each worker handles the rule indices congruent to its shard number, so the
+    shards are fully independent and no locking is needed on the output files.
+    On multi-GPU hosts each shard can be pinned to its own GPU through
+    CUDA_VISIBLE_DEVICES, overlapping the CPU-bound scene generation of one
+    worker with the GPU-bound rendering of another.
+
+    :param conf: Parsed command-line arguments with the config file, the number
+                 of shards, the optional GPU list, and the Blender executable.
+    """
+
+    with open(conf.config_file) as f:
+        args = yaml.safe_load(f.read())
+
+    gpus = [g for g in conf.gpus.split(",") if g] if conf.gpus else []
+
+    # In batch mode the shards re-render saved .blend files through
+    # render_batch.py instead of generating new scenes
+    script = "render_batch.py" if conf.batch else "render.py"
+
+    workers = []
+    for shard in range(conf.num_shards):
+        worker_args = ["--config-file", conf.config_file,
+                       "--shard", str(shard), "--num-shards", str(conf.num_shards)]
+        if conf.blender:
+            command = [conf.blender, "--background", "--python", script, "--"] + worker_args
+        else:
+            # Default workflow: the scripts run in the current interpreter with
+            # the pip-installed bpy module
+            command = [sys.executable, script] + worker_args
+        env = os.environ.copy()
+        if gpus:
+            # Pin each shard to one GPU so the workers render in parallel
+            env["CUDA_VISIBLE_DEVICES"] = gpus[shard % len(gpus)]
+        workers.append(subprocess.Popen(command, env=env))
+
+    exit_code = 0
+    for shard, worker in enumerate(workers):
+        if worker.wait() != 0:
+            print(f"Shard {shard} exited with code {worker.returncode}")
+            exit_code = 1
+
+    # Batch re-rendering writes images next to their blend files and produces
+    # no per-shard CSVs, so there is nothing to concatenate. A single shard
+    # writes ground_truth.csv directly; reopening it here would truncate it.
+    if conf.batch or conf.num_shards == 1:
+        return exit_code
+
+    # Concatenate the per-shard CSV files into the single ground truth file,
+    # keeping only the header of the first shard
+    output_dir = args["output_dir"]
+    csv_file_path = os.path.join(output_dir, "ground_truth.csv")
+    with open(csv_file_path, "w", newline="") as out_file:
+        for shard in range(conf.num_shards):
+            shard_path = os.path.join(output_dir, f"ground_truth_{shard}.csv")
+            if not os.path.exists(shard_path):
+                continue
+            with open(shard_path, newline="") as shard_file:
+                if shard > 0:
+                    shard_file.readline()
+                shutil.copyfileobj(shard_file, out_file)
+            os.remove(shard_path)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    """
+    Entry point for parallel dataset generation.
+
+    Parses command-line arguments and spawns one render.py worker per shard.
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--config-file", type=str, default="configs/simple_config.yml",
+                        help='config file for rendering')
+    parser.add_argument("-n", "--num-shards", type=int, default=2,
+                        help='number of worker processes to spawn')
+    parser.add_argument("--gpus", type=str, default="",
+                        help='comma-separated GPU indices to pin the shards to via '
+                             'CUDA_VISIBLE_DEVICES, e.g. "0,1"; empty leaves the '
+                             'GPU assignment to the config gpu_index')
+    parser.add_argument("--blender", type=str, default="",
+                        help='path to a Blender executable to run the workers with; '
+                             'empty runs them with the current Python interpreter '
+                             'and the bpy module')
+    parser.add_argument("--batch", action="store_true",
+                        help='re-render saved .blend files via render_batch.py '
+                             'instead of generating new scenes')
+    conf = parser.parse_args()
+
+    sys.exit(main(conf))
@@ -0,0 +1,122 @@
+import random
+from math import cos, sin, pi, sqrt, floor
+
+from mathutils import Vector
+
+
+class PoissonDiskSampler:
+    """
+    Bridson-style Poisson-disk sampler for object placement in the XY plane.
+
+    Instead of drawing uniform positions and rejecting them against every object in
+    the scene, candidates are grown from already accepted positions and validated
+    against a background grid, so each candidate only has to be compared with its
+    local neighborhood. The Blender-level collision check stays the authoritative
+    final verification; the sampler just makes candidate positions far more likely
+    to pass it.
+    """
+
+    def __init__(self, radius: float, anchor, min_distance: float, attempts: int = 30):
+        """
+        Initializes the sampler for a circular placement area.
+
+        :param radius: The radius of the placement disk around the anchor.
+        :param anchor: The center position of the placement disk.
+        :param min_distance: The minimum distance to keep between sampled positions.
+        :param attempts: The number of candidates to try per sample() call.
+        """
+
+        self.radius = radius
+        self.anchor = Vector(anchor)
+        self.min_distance = min_distance
+        self.attempts = attempts
+        # Grid cells are sized so that each cell can contain at most one sample
+        self.cell_size = min_distance / sqrt(2)
+        self.grid = {}
+        self.active = []
+
+    def _cell(self, x: float, y: float):
+        """
+        Returns the grid cell index of a position.
+
+        :param x: The X coordinate of the position.
+        :param y: The Y coordinate of the position.
+        :return: A tuple (ix, iy) identifying the grid cell.
+        """
+
+        return (floor((x - self.anchor.x) / self.cell_size),
+                floor((y - self.anchor.y) / self.cell_size))
+
+    def _fits(self, x: float, y: float):
+        """
+        Checks whether a candidate position keeps the minimum distance to all
+        registered positions in its grid neighborhood.
+
+        :param x: The X coordinate of the candidate.
+        :param y: The Y coordinate of the candidate.
+        :return: True if the candidate is far enough from all neighbors, otherwise False.
+        """
+
+        ix, iy = self._cell(x, y)
+        min_distance_sq = self.min_distance * self.min_distance
+        for dx in range(-2, 3):
+            for dy in range(-2, 3):
+                neighbor = self.grid.get((ix + dx, iy + dy))
+                if neighbor is not None and (neighbor[0] - x) ** 2 + (neighbor[1] - y) ** 2 < min_distance_sq:
+                    return False
+        return True
+
+    def register(self, position: Vector):
+        """
+        Records an accepted position so that later samples keep their distance to it.
+
+        :param position: The position (Vector) of a placed object; only X and Y are used.
+        """
+
+        point = (position.x, position.y)
+        self.grid[self._cell(point[0], point[1])] = point
+        self.active.append(point)
+
+    def sample(self):
+        """
+        Draws a candidate position inside the placement disk that keeps the minimum
+        distance to all registered positions.
+
+        :return: A Vector with the candidate position, or None if no candidate was
+                 found within the configured number of attempts.
+        """
+
+        radius_sq = self.radius * self.radius
+        for _ in range(self.attempts):
+            angle = random.uniform(0, 2 * pi)
+            if self.active:
+                # Grow the candidate from an already accepted position
+                base = random.choice(self.active)
+                distance = random.uniform(self.min_distance, 2 * self.min_distance)
+                x = base[0] + distance * cos(angle)
+                y = base[1] + distance * sin(angle)
+            else:
+                distance = random.uniform(0, self.radius)
+                x = self.anchor.x + distance * cos(angle)
+                y = self.anchor.y + distance * sin(angle)
+
+            if (x - self.anchor.x) ** 2 + (y - self.anchor.y) ** 2 > radius_sq:
+                continue
+            if self._fits(x, y):
+                return Vector((x, y, 0))
+        return None
+
+
+def object_spacing(zendo_object, margin: float = 0.0):
+    """
+    Computes a conservative minimum spacing for a Zendo object from its world
+    bounding box, so that two objects placed this far apart cannot collide.
+
+    :param zendo_object: The ZendoObject to derive the spacing from.
+    :param margin: An additional collision margin applied on both sides.
+    :return: The minimum center-to-center distance as a float.
+    """
+
+    bb_min, bb_max = zendo_object.get_aabb()
+    extent = max(bb_max[0] - bb_min[0], bb_max[1] - bb_min[1])
+    return float(extent) + 2 * margin
@@ -1,10 +1,11 @@
+import json
 import platform
+import shutil
 import sys, argparse
 from argparse import Namespace
 import yaml
-from rules.rules import generate_rule, generate_prolog_structure
+from rules.rules import generate_rule, generate_prolog_structure, load_json_rules, get_prolog_engine
 import time
-import csv
 import multiprocessing
 from multiprocessing import get_context
 from zendo_objects import *
@@ -12,95 +13,206 @@ from generate import generate_structure
 import utils
 from utils import debug
 
+# Directory of the executing Python script, resolved once at import time
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 
-def render(args, output_path, name):
+
+# Names of the devices activated by configure_render_settings. Device
+# enumeration goes through the GPU driver and is expensive (and on some
+# systems fragile), so it runs exactly once per process.
+_active_devices = None
+
+
+def configure_render_settings(args):
     """
-    Renders a scene using Blender's Cycles engine with specified settings.
+    Configures the compute device and the constant render settings once per run.
 
-    This function sets up the rendering configuration, including the compute device,
-    resolution, sampling, and output file format. It then performs the rendering
-    and optionally saves the Blender scene file.
+    All of these settings are identical for every scene, so they are applied a
+    single time after the base blend file is opened instead of once per render.
+    The device enumeration is only performed on the first call; reconfiguring
+    the scene settings (e.g. after opening another blend file) reuses the
+    already activated devices.
 
     :param args: Configuration arguments for rendering, including resolution,
-                 sample count, output directory, and rendering options.
-    :param output_path: The subdirectory within the output directory where
-                        the rendered image will be saved.
-    :param name: The name of the rendered image file (without extension).
+                 sample count, and rendering options.
     """
 
-    #######################################################
-    # Initialize render settings
-    #######################################################
-
-    # Detect system OS and configure the best rendering settings
-    system = platform.system()
+    global _active_devices
     preferences = bpy.context.preferences.addons["cycles"].preferences
 
-    # Set the best compute device type based on the OS
-    if system == "Darwin":
-        preferences.compute_device_type = "METAL"
-    elif system in ["Windows", "Linux"]:
-        preferences.compute_device_type = "OPTIX"
-    else:
-        preferences.compute_device_type = "NONE"
+    if _active_devices is None:
+        # Detect system OS and configure the best rendering settings
+        system = platform.system()
 
-    # Refresh device list after setting compute_device_type
-    preferences.get_devices()
+        # Set the best compute device type based on the OS
+        if system == "Darwin":
+            preferences.compute_device_type = "METAL"
+        elif system in ["Windows", "Linux"]:
+            preferences.compute_device_type = "OPTIX"
+        else:
+            preferences.compute_device_type = "NONE"
+
+        # Refresh device list after setting compute_device_type; this walks the
+        # GPU driver and must not be repeated per render
+        preferences.get_devices()
+
+        # Explicitly activate the available devices based on compute_device_type.
+        # With gpu_index >= 0 only that GPU is activated, so multiple worker
+        # processes can render in parallel with one distinct GPU each.
+        gpu_index = args.gpu_index
+        gpu_ordinal = 0
+        for device in preferences.devices:
+            # Activate only the OptiX device for NVIDIA GPU
+            if preferences.compute_device_type == "OPTIX" and device.type in ["OPTIX", "CUDA"]:
+                device.use = gpu_index < 0 or gpu_ordinal == gpu_index
+                gpu_ordinal += 1
+            # If using METAL on Mac, activate both GPU and CPU devices
+            elif preferences.compute_device_type == "METAL" and device.type in ["GPU", "CPU"]:
+                device.use = gpu_index < 0 or device.type == "CPU" or gpu_ordinal == gpu_index
+                if device.type == "GPU":
+                    gpu_ordinal += 1
+            # Use CPU if no other options are available
+            elif preferences.compute_device_type == "NONE" and device.type == "CPU":
+                device.use = True
+            else:
+                # Ensure other devices are not used
+                device.use = False
+
+        _active_devices = tuple(device.name for device in preferences.devices if device.use)
+
+        # Debug render devices being used
+        debug(f"Using compute_device_type: {preferences.compute_device_type}")
+        for device in preferences.devices:
+            debug(f"Device: {device.name}, Type: {device.type}, Active: {device.use}")
 
     # Set render device to GPU if available; otherwise, use CPU
     if preferences.compute_device_type in ["OPTIX", "METAL"]:
         bpy.context.scene.cycles.device = "GPU"
     else:
         bpy.context.scene.cycles.device = "CPU"
+    debug(f"Render device set to: {bpy.context.scene.cycles.device}")
 
-    # Explicitly activate the available devices based on compute_device_type
-    for device in preferences.devices:
-        # Activate only the OptiX device for NVIDIA GPU
-        if preferences.compute_device_type == "OPTIX" and device.type in ["OPTIX", "CUDA"]:
-            device.use = True
-        # If using METAL on Mac, activate both GPU and CPU devices
-        elif preferences.compute_device_type == "METAL" and device.type in ["GPU", "CPU"]:
-            device.use = True
-        # Use CPU if no other options are available
-        elif preferences.compute_device_type == "NONE" and device.type == "CPU":
-            device.use = True
-        else:
-            # Ensure other devices are not used
-            device.use = False
+    # Set the constant rendering properties
+    scene = bpy.context.scene
+    scene.render.image_settings.file_format = args.image_format
+    if args.image_format == 'PNG':
+        # The images are low-entropy primitives on a flat background, so a low
+        # zlib effort compresses nearly as well while costing far less CPU
+        scene.render.image_settings.compression = int(args.png_compression)
+    scene.render.resolution_x = args.width
+    scene.render.resolution_y = args.height
+    # Draft mode renders at a fraction of the resolution for fast iteration on
+    # configs and rules; ray count scales linearly with the pixel count
+    scene.render.resolution_percentage = int(args.draft_percentage) if args.draft_mode else 100
+
+    # Keep BVH, textures and shader compilations alive between renders; the
+    # base scene (camera, lights, floor) is identical across all frames, so
+    # only the few changed objects are re-synced per render. Costs extra VRAM.
+    scene.render.use_persistent_data = True
+
+    if args.engine.upper() == 'EEVEE':
+        # EEVEE rasterizes in near real time for users who do not need
+        # raytraced images; Blender 4.x renamed the engine identifier
+        try:
+            scene.render.engine = 'BLENDER_EEVEE_NEXT'
+        except TypeError:
+            scene.render.engine = 'BLENDER_EEVEE'
+        scene.eevee.taa_render_samples = int(args.render_num_samples)
+        return
+
+    scene.render.engine = 'CYCLES'
+    scene.cycles.samples = int(args.render_num_samples)
+
+    # Large tiles exploit GPU parallelism, small tiles suit CPU rendering.
+    # Blender >= 3.0 exposes a single cycles.tile_size instead of tile_x/tile_y.
+    tile_size = int(args.render_tile_size) if scene.cycles.device == "GPU" else 16
+    if hasattr(scene.cycles, "tile_size"):
+        scene.cycles.tile_size = tile_size
+    else:
+        scene.render.tile_x = scene.render.tile_y = tile_size
+
+    # Stop sampling pixels early once their noise falls below the threshold,
+    # so easy pixels do not consume the full sample budget
+    scene.cycles.use_adaptive_sampling = True
+    scene.cycles.adaptive_threshold = 0.01
+
+    # Denoising reaches the same perceptual quality at far fewer samples;
+    # prefer the OptiX denoiser when rendering on an NVIDIA GPU
+    scene.cycles.use_denoising = True
+    if scene.cycles.device == "GPU" and preferences.compute_device_type == "OPTIX":
+        scene.cycles.denoiser = 'OPTIX'
+    else:
+        scene.cycles.denoiser = 'OPENIMAGEDENOISE'
 
-    # Debug render devices being used
-    debug(f"Using compute_device_type: {preferences.compute_device_type}")
-    debug(f"Render device set to: {bpy.context.scene.cycles.device}")
-    for device in preferences.devices:
-        debug(f"Device: {device.name}, Type: {device.type}, Active: {device.use}")
+    # The scenes are simple primitives, so deep light paths add cost without
+    # visible benefit; cap the secondary bounces accordingly
+    scene.cycles.max_bounces = int(args.render_max_bounces)
+    scene.cycles.diffuse_bounces = 2
+    scene.cycles.glossy_bounces = 2
+    scene.cycles.volume_bounces = 0
+
+
+def flush_scratch(scratch_dir, output_dir):
+    """
+    Moves the render output staged in a scratch directory into its final output
+    directory, so the slow target filesystem is hit in bulk instead of on the
+    render critical path.
+
+    :param scratch_dir: The scratch directory holding the staged files.
+    :param output_dir: The final output directory for this rule.
+    """
+
+    for entry in os.listdir(scratch_dir):
+        shutil.move(os.path.join(scratch_dir, entry), os.path.join(output_dir, entry))
+
+
+def redirect_render_output(logfile='blender_render.log'):
+    """
+    Redirects the C-level stdout of the process into the render log file.
+
+    Blender's render engine writes its progress through the stdout file
+    descriptor, so redirecting that descriptor once replaces the dup/close
+    dance previously performed around every render call. Python-level prints
+    keep going to the original stdout through a saved duplicate.
+
+    :param logfile: The path of the log file receiving the render output.
+    """
+
+    logfd = os.open(logfile, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    sys.stdout.flush()
+    saved = os.dup(sys.stdout.fileno())
+    os.dup2(logfd, sys.stdout.fileno())
+    os.close(logfd)
+    sys.stdout = os.fdopen(saved, "w", buffering=1)
+
+
+def render(args, output_dir, name):
+    """
+    Renders a scene using Blender's Cycles engine.
+
+    The render device and the constant render settings are configured once by
+    :func:`configure_render_settings`; this function only sets the per-scene
+    output path, performs the rendering, and optionally saves the Blender
+    scene file.
+
+    :param args: Configuration arguments for rendering, including the output
+                 directory and rendering options.
+    :param output_dir: The precomputed directory where the rendered image
+                       will be saved.
+    :param name: The name of the rendered image file (without extension).
+    """
 
     #######################################################
     # Render
     #######################################################
 
-    # Get the directory of the executing Python script
-    script_dir = os.path.dirname(os.path.realpath(__file__))
-
-    # Set rendering properties
-    bpy.context.scene.render.engine = 'CYCLES'
-    bpy.context.scene.render.filepath = os.path.join(script_dir, args.output_dir, output_path, name)
-    bpy.context.scene.render.image_settings.file_format = 'PNG'
-    bpy.context.scene.cycles.samples = int(args.render_num_samples)
-    bpy.context.scene.render.resolution_x = args.width
-    bpy.context.scene.render.resolution_y = args.height
-    bpy.context.scene.render.resolution_percentage = 100
+    # Set the per-scene output path
+    bpy.context.scene.render.filepath = os.path.join(output_dir, name)
 
     debug(f"Saving output image to: {bpy.context.scene.render.filepath}")
 
-    # Redirect output to log file
-    logfile = 'blender_render.log'
-    open(logfile, 'a').close()
-    old = os.dup(sys.stdout.fileno())
-    sys.stdout.flush()
-    os.close(sys.stdout.fileno())
-    fd = os.open(logfile, os.O_WRONLY)
-
-    # Do the rendering
+    # Do the rendering; its C-level output goes to the render log set up once
+    # by redirect_render_output
     render_start = time.time()
     bpy.ops.render.render(write_still=True)
     render_end = time.time()
@@ -109,14 +221,9 @@ def render(args, output_path, name):
     render_duration = render_end - render_start
     print(f"Render time: {render_duration:.4f} seconds")
 
-    # Disable output redirection
-    os.close(fd)
-    os.dup(old)
-    os.close(old)
-
     if args.save_blendfile:
         bpy.context.preferences.filepaths.save_version = 0
-        bpy.ops.wm.save_as_mainfile(filepath=os.path.join(args.output_dir, output_path, f"{name}.blend"))
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.join(output_dir, f"{name}.blend"))
 
     return render_duration
 
@@ -132,45 +239,121 @@ def get_all_scene_objects():
     :return: A list of Blender mesh objects that match the specified types.
     """
 
-    bpy.context.view_layer.update()
-    object_list = []
-    for obj in bpy.data.objects:
-        if obj.type == 'MESH' and any(k in obj.name for k in ["Pyramid", "Wedge", "Block"]):
-            object_list.append(obj)
-    return object_list
+    ensure_view_layer_updated()
+    # Generated objects are named "<idx>_<shape>", so a single tuple-prefix
+    # check on the part after the index replaces three substring scans
+    shape_prefixes = ("Pyramid", "Wedge", "Block")
+    return [obj for obj in bpy.data.objects
+            if obj.type == 'MESH' and obj.name.partition("_")[2].startswith(shape_prefixes)]
+
+
+# Persistent worker pool for Prolog queries, shared across all calls so a new
+# process does not have to be forked per query. The pool must stay a separate
+# process: a Python-level timeout cannot interrupt a query stuck inside the
+# SWI-Prolog C runtime, only killing the worker can.
+_prolog_pool = None
+_prolog_pool_file = None
+_worker_prolog_file = None
+
+
+def _init_prolog_worker(prolog_file):
+    """
+    Pool initializer that stores the Prolog rules file in the worker process,
+    so each query task only has to carry the example count and the query string.
+
+    :param prolog_file: The path to the Prolog file containing the rules.
+    """
+
+    global _worker_prolog_file
+    _worker_prolog_file = prolog_file
+
 
+def _run_prolog_query(task):
+    """
+    Executes a single Prolog query task inside the worker process.
 
-def threading_prolog_query(args):
+    :param task: A tuple containing the number of examples, the Prolog query,
+                 and whether the query cache may be used.
+    :return: A list of generated structures.
+    """
+
+    num_examples, query, use_cache = task
+    return generate_prolog_structure(num_examples, query, _worker_prolog_file, use_cache)
+
+
+def _get_prolog_pool(prolog_file):
+    """
+    Returns the persistent Prolog worker pool, creating it on first use or when
+    the rules file changed.
+
+    :param prolog_file: The path to the Prolog file containing the rules.
+    :return: The multiprocessing pool running the Prolog worker.
+    """
+
+    global _prolog_pool, _prolog_pool_file
+    if _prolog_pool is None or _prolog_pool_file != prolog_file:
+        if _prolog_pool is not None:
+            _prolog_pool.terminate()
+        # Fork shares the parent's pre-warmed rules and engine copy-on-write;
+        # Windows has no fork, so the worker is spawned there instead
+        context = get_context("fork" if hasattr(os, "fork") else "spawn")
+        _prolog_pool = context.Pool(processes=1, initializer=_init_prolog_worker,
+                                    initargs=(prolog_file,))
+        _prolog_pool_file = prolog_file
+    return _prolog_pool
+
+
+def threading_prolog_query(args, use_cache=True):
     """
     Executes a Prolog query for generating scene structures in a separate process
     to prevent infinite loops caused by complex queries.
 
     If the query takes longer than 5 seconds, it is aborted to avoid stalling.
+    The worker process is reused across queries; it is only discarded and
+    recreated after a timeout, when it may still be stuck inside the query.
 
     :param args: A tuple containing the number of examples, the Prolog query,
                  and the path to the Prolog rules file.
+    :param use_cache: If True, an identical earlier query may be answered from
+                      the structure cache; retries pass False.
     :return: The result of the Prolog query if completed within the timeout,
              otherwise returns None.
     """
 
-    # Start a thread to time it
-    pool = get_context("fork").Pool(processes=1)
-    result_async = pool.apply_async(generate_prolog_structure,
-                                    args=args)
+    global _prolog_pool
+    num_examples, query, prolog_file = args
+
+    pool = _get_prolog_pool(prolog_file)
+    result_async = pool.apply_async(_run_prolog_query, args=((num_examples, query, use_cache),))
 
     try:
         result = result_async.get(timeout=5)
     except multiprocessing.TimeoutError:
-        debug(f"Timeout: Generating the sample for '{args[1]}' took longer than 5 seconds!")
-        pool.close()
+        debug(f"Timeout: Generating the sample for '{query}' took longer than 5 seconds!")
+        pool.terminate()
+        _prolog_pool = None
         return None
     else:
-        pool.close()
-        pool.join()
         return result
 
 
-def generate_blender_examples(args, collection, num_examples, rule_idx, rule, query, negative=False):
+def _csv_field(value):
+    """
+    Formats a value as a CSV field, quoting and escaping it the way csv.writer
+    does when the text contains a delimiter, quote, or line break.
+
+    :param value: The value to format.
+    :return: The CSV-safe string representation of the value.
+    """
+
+    text = str(value)
+    if any(c in text for c in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def generate_blender_examples(args, collection, num_examples, rule_idx, rule, query, csv_file,
+                              output_dir, negative=False):
     """
     Generates Blender scenes based on Prolog query results and renders them.
 
@@ -184,6 +367,8 @@ def generate_blender_examples(args, collection, num_examples, rule_idx, rule, qu
     :param rule_idx: Index of the rule being applied.
     :param rule: The rule description used for scene generation.
     :param query: The Prolog query defining the scene structure.
+    :param csv_file: The long-lived file object of the ground truth CSV.
+    :param output_dir: The precomputed output directory for this rule's renders.
     :param negative: Boolean flag indicating whether negative examples should be generated.
     :return: True if scenes were successfully generated, False otherwise.
     """
@@ -196,6 +381,11 @@ def generate_blender_examples(args, collection, num_examples, rule_idx, rule, qu
     if scenes is None:
         return False, 0.0, 0.0
 
+    # Rule and query are identical for every CSV row of this call, so they
+    # only have to be escaped once
+    rule_field = _csv_field(rule)
+    query_field = _csv_field(query)
+
     i = 0
     j = 0
     while i < num_examples:
@@ -203,41 +393,46 @@ def generate_blender_examples(args, collection, num_examples, rule_idx, rule, qu
         scene_name = f"{rule_idx}_{i}"
         if negative:
             scene_name = f"{rule_idx}_{i}_n"
-        img_path = os.path.join(args.output_dir, f"{rule_idx}", scene_name + ".png")
+        # file_extension includes the leading dot and tracks the configured
+        # image_format, so BMP runs record .bmp paths instead of .png
+        img_path = os.path.join(args.output_dir, f"{rule_idx}",
+                                scene_name + bpy.context.scene.render.file_extension)
 
         try:
             # Now generate it in blender
             generate_structure(args, structure, collection)
-            render_time = render(args, str(rule_idx), scene_name)
+            render_time = render(args, output_dir, scene_name)
             render_time_total += render_time
 
-            # Buffer scene objects for writing to CSV
+            # Buffer scene objects for writing to CSV, measuring all of their
+            # bounding boxes in one batched pass
             scene_objects = ZendoObject.instances
+            min_bb, max_bb, world_pos = world_bounding_boxes(scene_objects)
 
-            csv_file_path = os.path.join(args.output_dir, "ground_truth.csv")
-
-            with open(csv_file_path, "a", newline="") as csvfile:
-                csv_writer = csv.writer(csvfile)
-
-                for obj in scene_objects:
-                    min_bb, max_bb = obj.get_world_bounding_box()
-                    world_pos = obj.get_position()
+            # Format the fixed-schema rows directly instead of going through
+            # csv.writer's per-field quoting loop, and write them in one call;
+            # the first four fields are shared by all rows of the scene
+            row_prefix = f"{scene_name},{img_path},{rule_field},{query_field},"
+            rows = [f"{row_prefix}{obj.name},"
+                    f"{bb_min[0]},{bb_min[1]},{bb_min[2]},{bb_max[0]},{bb_max[1]},{bb_max[2]},"
+                    f"{pos[0]},{pos[1]},{pos[2]}\r\n"
+                    for obj, bb_min, bb_max, pos in zip(scene_objects, min_bb, max_bb, world_pos)]
+            csv_file.write("".join(rows))
 
-                    csv_writer.writerow([scene_name, img_path, rule, query, obj.name,
-                                         min_bb.x, min_bb.y, min_bb.z, max_bb.x, max_bb.y, max_bb.z,
-                                         world_pos.x, world_pos.y, world_pos.z])
-
-            # TODO: Check if this really is a fix for the generation of multiple scenes
-            for obj in collection.objects:
-                bpy.data.objects.remove(obj, do_unlink=True)
-            ZendoObject.instances.clear()
+            # Reset the base scene in place instead of reopening the blend file
+            clear_scene(collection)
 
             i += 1
 
         except Exception as e:
-            # If not possible to generate in blender, generate a new structure with prolog and try again
+            # If not possible to generate in blender, regenerate all remaining
+            # structures in one watchdog-guarded Prolog call and try again
             debug(f"Error in scene generation: {e}")
-            scenes[i] = generate_prolog_structure(1, query, args.rules_prolog_file)[0]
+            remaining = threading_prolog_query(args=(num_examples - i, query, args.rules_prolog_file),
+                                               use_cache=False)
+            if remaining is None:
+                return False, 0.0, 0.0
+            scenes[i:] = remaining
             j += 1
             if j >= args.resolve_attempts:
                 debug(f"Timeout in resolve of structure dependencies: {e}")
@@ -250,6 +445,98 @@ def generate_blender_examples(args, collection, num_examples, rule_idx, rule, qu
     return True, render_time_total, cpu_time
 
 
+def initialize_run(args):
+    """
+    Performs the one-time process setup shared by the standalone and worker modes.
+
+    Opens the base scene, disables the undo history, configures the render
+    settings, redirects the render output, and pre-warms the rule files and the
+    Prolog engine.
+
+    :param args: Configuration arguments for rendering and file paths.
+    """
+
+    script_dir = os.path.dirname(bpy.data.filepath)
+    if script_dir not in sys.path:
+        sys.path.append(script_dir)
+
+    bpy.ops.wm.open_mainfile(filepath=args.base_scene_blendfile)
+
+    # Undo history is pure overhead for a headless generation run; without it the
+    # operators used during scene setup no longer serialize undo steps
+    bpy.context.preferences.edit.use_global_undo = False
+
+    # Configure the render device and constant render settings once for the run
+    configure_render_settings(args)
+
+    # Send the render engine's output to the log file once for the whole run
+    redirect_render_output()
+
+    # Load and parse the rule files once in the parent process, before the forked
+    # Prolog worker exists, so the children inherit the parsed rules and the
+    # consulted engine via copy-on-write instead of re-reading them from disk
+    load_json_rules(args.rules_json_file)
+    get_prolog_engine(args.rules_prolog_file)
+
+
+def open_ground_truth_csv(csv_file_path):
+    """
+    Opens a ground truth CSV file with a large write buffer and writes the header.
+
+    :param csv_file_path: The path of the CSV file to create.
+    :return: The opened file object.
+    """
+
+    os.makedirs(os.path.dirname(csv_file_path), exist_ok=True)
+    csvfile = open(csv_file_path, "w", newline="", buffering=1 << 20)
+    csvfile.write(",".join(["scene_name", "img_path", "rule", "query", "object_name",
+                            "bounding_box_min_x", "bounding_box_min_y", "bounding_box_min_z",
+                            "bounding_box_max_x", "bounding_box_max_y", "bounding_box_max_z",
+                            "world_pos_x", "world_pos_y", "world_pos_z"]) + "\r\n")
+    return csvfile
+
+
+def run_worker(args):
+    """
+    Runs the generator as a persistent worker driven by a parent controller.
+
+    Jobs arrive as JSON lines on stdin, e.g.
+    {"rule_idx": 3, "rule": "...", "query": "...", "negative": false},
+    and a JSON status line is reported back on stdout after each job. The
+    controller amortizes the Blender startup and the warm render caches over
+    the whole dataset instead of paying them per invocation.
+
+    :param args: Configuration arguments for scene generation and rendering.
+    """
+
+    initialize_run(args)
+
+    collection = bpy.data.collections.new("Structure")
+    bpy.context.scene.collection.children.link(collection)
+
+    csvfile = open_ground_truth_csv(os.path.join(args.output_dir, f"ground_truth_{os.getpid()}.csv"))
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        rule_idx = job["rule_idx"]
+        output_dir = os.path.join(SCRIPT_DIR, args.output_dir, str(rule_idx))
+        os.makedirs(output_dir, exist_ok=True)
+
+        job_start = time.time()
+        success, render_time, _ = generate_blender_examples(
+            args, collection, job.get("num_examples", args.num_examples), rule_idx,
+            job["rule"], job["query"], csvfile, output_dir, job.get("negative", False))
+        print(json.dumps({"rule_idx": rule_idx,
+                          "status": "ok" if success else "failed",
+                          "render_time": render_time,
+                          "total_time": time.time() - job_start}), flush=True)
+
+    csvfile.close()
+
+
 def main(args):
     """
     Main function to generate and render structured scenes based on specified rules.
@@ -265,11 +552,7 @@ def main(args):
     # Main
     #######################################################
     start_time = time.time()
-    script_dir = os.path.dirname(bpy.data.filepath)
-    if script_dir not in sys.path:
-        sys.path.append(script_dir)
-
-    bpy.ops.wm.open_mainfile(filepath=args.base_scene_blendfile)
+    initialize_run(args)
 
     rules_json_file = args.rules_json_file
     num_rules = args.num_rules
@@ -277,22 +560,39 @@ def main(args):
     num_invalid_examples = args.num_invalid_examples
     generate_invalid_examples = args.generate_invalid_examples
 
-    # Write CSV header
-    csv_file_path = os.path.join(args.output_dir, "ground_truth.csv")
-    os.makedirs(args.output_dir, exist_ok=True)
-    with open(csv_file_path, "w", newline="") as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(["scene_name", "img_path", "rule", "query", "object_name",
-                             "bounding_box_min_x", "bounding_box_min_y", "bounding_box_min_z",
-                             "bounding_box_max_x", "bounding_box_max_y", "bounding_box_max_z",
-                             "world_pos_x", "world_pos_y", "world_pos_z"])
+    # Open the ground truth CSV once for the whole run and write the header;
+    # shards write to separate files that the driver concatenates afterwards
+    if args.num_shards > 1:
+        csv_file_path = os.path.join(args.output_dir, f"ground_truth_{args.shard}.csv")
+    else:
+        csv_file_path = os.path.join(args.output_dir, "ground_truth.csv")
+    csvfile = open_ground_truth_csv(csv_file_path)
+
+    # Precompute and create the per-rule output directories up front, so the
+    # render hot path only joins the file name onto a ready-made directory
+    rule_out_dirs = [os.path.join(SCRIPT_DIR, args.output_dir, str(rule_idx))
+                     for rule_idx in range(num_rules)]
+    for rule_out_dir in rule_out_dirs:
+        os.makedirs(rule_out_dir, exist_ok=True)
+
+    # With a scratch directory configured (e.g. /dev/shm), renders are staged
+    # in RAM-backed storage and moved into the output directory per rule
+    scratch_base = None
+    rule_render_dirs = rule_out_dirs
+    if args.scratch_dir:
+        scratch_base = os.path.join(args.scratch_dir, f"zendo_{os.getpid()}")
+        rule_render_dirs = [os.path.join(scratch_base, str(rule_idx)) for rule_idx in range(num_rules)]
+        for rule_render_dir in rule_render_dirs:
+            os.makedirs(rule_render_dir, exist_ok=True)
 
     total_gpu_time = 0.0
     total_cpu_time = 0.0
     total_failed_time = 0.0
     failed_attempts = 0
 
-    r = 0
+    # Each shard processes the rule indices congruent to its shard number, so
+    # multiple worker processes can generate disjoint parts of the dataset
+    r = args.shard
 
     while r < num_rules:
         print(f"Generating rule {r + 1}/{num_rules}...")
@@ -304,7 +604,8 @@ def main(args):
 
         attempt_start = time.time()
         generated_successfully, render_time, cpu_time = generate_blender_examples(args, collection, num_examples, r,
-                                                                                  rule, query, False)
+                                                                                  rule, query, csvfile,
+                                                                                  rule_render_dirs[r], False)
         attempt_end = time.time()
 
         # If result is not true, then prolog query took to long, therefore try again
@@ -320,7 +621,8 @@ def main(args):
         if generate_invalid_examples:
             inv_start = time.time()
             success_invalid, render_time_invalid, cpu_time_invalid = generate_blender_examples(args, collection, num_invalid_examples,
-                                                                                 r, rule, n_query, True)
+                                                                                 r, rule, n_query, csvfile,
+                                                                                 rule_render_dirs[r], True)
             inv_end = time.time()
 
             if not success_invalid:
@@ -330,7 +632,15 @@ def main(args):
                 total_gpu_time += render_time_invalid
                 total_cpu_time += cpu_time_invalid
 
-        r += 1
+        if scratch_base is not None:
+            flush_scratch(rule_render_dirs[r], rule_out_dirs[r])
+
+        r += args.num_shards
+
+    csvfile.close()
+
+    if scratch_base is not None:
+        shutil.rmtree(scratch_base, ignore_errors=True)
 
     print(f"\nDataset generation complete.")
 
@@ -353,13 +663,26 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("-c", "--config-file", type=str, default="configs/simple_config.yml",
                         help='config file for rendering')
-    conf = parser.parse_args()
+    parser.add_argument("--shard", type=int, default=0,
+                        help='index of this worker process; it handles the rule indices '
+                             'congruent to this number modulo --num-shards')
+    parser.add_argument("--num-shards", type=int, default=1,
+                        help='total number of worker processes generating the dataset')
+    parser.add_argument("--worker", action="store_true",
+                        help='run as a persistent worker reading JSON-line jobs from stdin '
+                             'instead of generating the rules itself')
+    conf = utils.parse_args(parser)
 
     with open(conf.config_file) as f:
         args = yaml.safe_load(f.read())  # load the config file
 
     args = Namespace(**args)
+    args.shard = conf.shard
+    args.num_shards = conf.num_shards
 
     utils.DEBUG_PRINTING = args.debug_printing
 
-    main(args)
+    if conf.worker:
+        run_worker(args)
+    else:
+        main(args)
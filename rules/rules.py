@@ -1,4 +1,6 @@
 import sys, os, random, json, re
+import copy
+import functools
 from dataclasses import dataclass, field
 from pyswip import Prolog
 from utils import debug
@@ -120,9 +122,13 @@ def make_placeholder_template(placeholder_id: str, template_text: str, prolog_li
     return PlaceholderTemplate(placeholder_id, template_text, placeholders, tokens, prolog_list, orientations)
 
 
+@functools.lru_cache(maxsize=None)
 def load_json_rules(filename) -> Rules | None:
     """
     Loads placeholder rules from a JSON file and constructs a Rules object.
+    The parsed Rules object is cached per filename, so repeated calls (one per
+    generated rule) do not re-read and re-parse the file. The returned object
+    is only ever read during rule generation.
 
     :param filename: The path to the JSON file containing the rules.
     :return: A Rules object containing parsed placeholder rules, or None if loading fails.
@@ -715,18 +721,53 @@ def generate_rule(rules_json_file='rules/zendo_rules.json'):
     return rule, query, n_query
 
 
-def generate_prolog_structure(num_examples, query, prolog_file='rules/rules.pl'):
+# Persistent Prolog engine, consulted once per rules file instead of per query
+_prolog_engine = None
+_consulted_files = set()
+
+
+def get_prolog_engine(prolog_file):
+    """
+    Returns the shared Prolog engine, consulting the given rules file on first use.
+
+    :param prolog_file: The path to the Prolog file containing the rules.
+    :return: The persistent Prolog instance.
+    """
+
+    global _prolog_engine
+    if _prolog_engine is None:
+        _prolog_engine = Prolog()
+    if prolog_file not in _consulted_files:
+        _prolog_engine.consult(prolog_file)
+        _consulted_files.add(prolog_file)
+    return _prolog_engine
+
+
+# Query results cached by (query, num_examples). Rules are drawn from a finite
+# template pool, so repeated queries can reuse the structures of the first run
+# instead of re-running Prolog
+_structure_cache = {}
+
+
+def generate_prolog_structure(num_examples, query, prolog_file='rules/rules.pl', use_cache=True):
     """
     Executes a Prolog query to generate structural examples.
 
     :param num_examples: The number of examples to generate.
     :param query: The Prolog query to execute.
     :param prolog_file: The path to the Prolog file containing the rules.
+    :param use_cache: If True, reuses the cached result of an identical earlier
+                      query. Retries pass False to draw fresh structures after
+                      a cached one failed to resolve.
     :return: A list of generated structures.
     """
 
-    prolog = Prolog()
-    prolog.consult(prolog_file)
+    cache_key = (query, num_examples)
+    if use_cache and cache_key in _structure_cache:
+        # Copy on hit so callers can modify their result independently
+        return copy.deepcopy(_structure_cache[cache_key])
+
+    prolog = get_prolog_engine(prolog_file)
 
     # Execute the random queries
     results = []
@@ -737,6 +778,9 @@ def generate_prolog_structure(num_examples, query, prolog_file='rules/rules.pl')
             structure = szene["Structure"]
             results.append(structure)
 
+    if use_cache:
+        _structure_cache[cache_key] = copy.deepcopy(results)
+
     return results
 
 
@@ -1,7 +1,7 @@
 import bpy
 import mathutils
 from mathutils import Vector
-from zendo_objects import ZendoObject, Pyramid, Block, Wedge
+from zendo_objects import ZendoObject, Pyramid, Block, Wedge, ensure_view_layer_updated
 import math
 import copy
 import random
@@ -15,6 +15,10 @@ face_map = {
     "bottom": ('Z', -1),
 }
 
+# Maps each face to the face on the opposite side of the same axis
+_inverse_face_map = {(axis, -direction): face for face, (axis, direction) in face_map.items()}
+opposite_face = {face: _inverse_face_map[(axis, direction)] for face, (axis, direction) in face_map.items()}
+
 
 def check_beneath(object: ZendoObject):
     """
@@ -62,7 +66,7 @@ def on_top(object_1: ZendoObject, target: ZendoObject, margin: float = 0.0):
     :param margin: An optional margin to offset object_1 and prevent clipping.
     """
 
-    bpy.context.view_layer.update()
+    ensure_view_layer_updated()
     if type(target) is Pyramid and object_1.pose == 'upright' and target.pose == 'upright':
         nested(object_1, target)
     else:
@@ -87,7 +91,7 @@ def touching(object_1: ZendoObject, object_2: ZendoObject, face: str = 'left', m
     """
 
     # Ensure the requested face is valid
-    bpy.context.view_layer.update()
+    ensure_view_layer_updated()
     if face not in face_map:
         raise ValueError(
             f"{face} is not a valid face! "
@@ -121,6 +125,7 @@ def touching(object_1: ZendoObject, object_2: ZendoObject, face: str = 'left', m
 
     # Move object_1 to touch object_2
     object_1.obj.location[axis_index] += offset
+    object_1.invalidate_bounds()
 
     if face == "top":
         object_1.grounded = False
@@ -139,7 +144,7 @@ def nested(object_1: ZendoObject, object_2: Pyramid):
     """
 
     # Move the first object inside the second one
-    bpy.context.view_layer.update()
+    ensure_view_layer_updated()
     obj_2_pos = object_2.get_position()
     object_1.set_position(obj_2_pos)
 
@@ -196,7 +201,7 @@ def pointing(object_1: ZendoObject, target: ZendoObject):
     """
 
     # Ensure the scene is updated
-    bpy.context.view_layer.update()
+    ensure_view_layer_updated()
 
     origin = object_1.obj.matrix_world.translation
 
@@ -232,6 +237,7 @@ def pointing(object_1: ZendoObject, target: ZendoObject):
     # Apply the rotation while preserving other rotations
     object_1.obj.rotation_mode = 'QUATERNION'
     object_1.obj.rotation_quaternion = rotation_quaternion @ object_1.obj.rotation_quaternion
+    object_1.invalidate_bounds()
 
     object_1.pointing = target
-    bpy.context.view_layer.update()
+    ensure_view_layer_updated()
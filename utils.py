@@ -4,19 +4,22 @@ DEBUG_PRINTING = False
 
 def extract_args(input_argv=None):
     """
-    Extracts command-line arguments provided after "--" to forward them to the script.
+    Extracts the command-line arguments meant for the script itself.
+
+    When run through Blender ("blender --background --python script.py -- ..."),
+    only the arguments after the "--" separator belong to the script; without a
+    separator (plain "python script.py ..."), all arguments do.
 
     :param input_argv: Optional list of command-line arguments. If None, defaults to sys.argv.
-    :return: List of arguments following the "--" separator.
+    :return: List of arguments addressed to the script.
     """
 
     if input_argv is None:
         input_argv = sys.argv
-    output_argv = []
     if '--' in input_argv:
         idx = input_argv.index('--')
-        output_argv = input_argv[(idx + 1):]
-    return output_argv
+        return input_argv[(idx + 1):]
+    return input_argv[1:]
 
 
 def parse_args(parser, argv=None):
@@ -9,13 +9,125 @@ from utils import debug
 from dataclasses import dataclass
 
 
+# Set whenever an object transform changed without the view layer being updated yet,
+# so the depsgraph evaluation can be deferred until a consumer actually needs it
+_depsgraph_dirty = False
+
+
+def mark_depsgraph_dirty():
+    """
+    Flags the view layer as outdated after an object transform changed.
+    """
+
+    global _depsgraph_dirty
+    _depsgraph_dirty = True
+
+
+def ensure_view_layer_updated():
+    """
+    Updates the view layer only if an object transform changed since the last update.
+    Replaces unconditional bpy.context.view_layer.update() calls in the placement hot
+    path, collapsing repeated depsgraph evaluations per retry into a single one.
+    """
+
+    global _depsgraph_dirty
+    if _depsgraph_dirty:
+        bpy.context.view_layer.update()
+        _depsgraph_dirty = False
+
+
+# Prototype meshes shared between objects, keyed by (shape, color). The shape's
+# blend file is appended only once; each color variant is a mesh copy with its own
+# material, so creating an object is just bpy.data.objects.new plus a transform.
+_base_meshes = {}
+_prototype_meshes = {}
+
+# Released Blender objects kept for reuse across scenes, keyed by (shape, color).
+# Recycling an object datablock avoids the remove/new/link churn per scene; the
+# next ZendoObject of the same shape and color only has to set its transform.
+_free_objects = {}
+
+
+def get_prototype_mesh(args, shape: str, color: str, color_code: list[float]):
+    """
+    Returns the shared prototype mesh for a shape and color combination, appending
+    the shape's blend file and coloring a mesh copy on first use.
+
+    :param args: Configuration arguments including paths to resources.
+    :param shape: Shape type of the object (e.g., "Pyramid", "Block", "Wedge").
+    :param color: Color name for the object.
+    :param color_code: RGBA color values to apply to the prototype material.
+    :return: The Blender mesh datablock shared by all objects of this shape and color.
+    """
+
+    key = (shape, color)
+    mesh = _prototype_meshes.get(key)
+    if mesh is not None:
+        return mesh
+
+    base_mesh = _base_meshes.get(shape)
+    if base_mesh is None:
+        # Load object from file
+        filename = os.path.join(args.shape_dir, '%s.blend' % shape.lower(), 'Object', shape)
+        bpy.ops.wm.append(filename=filename)
+        base_obj = bpy.data.objects[shape]
+        base_mesh = base_obj.data
+        # Keep the datablock alive while no object uses it
+        base_mesh.use_fake_user = True
+        bpy.data.objects.remove(base_obj, do_unlink=True)
+        _base_meshes[shape] = base_mesh
+
+    mesh = base_mesh.copy()
+    mesh.name = f"{shape}_{color}"
+    mesh.use_fake_user = True
+    material = mesh.materials[0].copy()
+    material.name = f"{shape}_{color}"
+    mesh.materials[0] = material
+    _set_material_color(material, color_code)
+    _prototype_meshes[key] = mesh
+    return mesh
+
+
+def _set_material_color(material, color: list[float]):
+    """
+    Sets a material's color by adjusting its RGB node value.
+
+    :param material: The Blender material to modify.
+    :param color: A list containing RGBA color values (floats between 0 and 1).
+    :raises Exception: If the material or its RGB node is missing.
+    """
+
+    # Check if the material exists and uses nodes
+    if not material:
+        raise Exception("No material found.")
+
+    if not material.use_nodes:
+        raise Exception(f"Material '{material.name}' does not use nodes.")
+
+    nodes = material.node_tree.nodes
+
+    # Look for an RGB node labeled "Color"
+    color_node = None
+    for node in nodes:
+        if node.type == 'RGB':  # and (node.label == "Color" or node.name == "Color"):
+            color_node = node
+            break
+
+    if not color_node:
+        raise Exception("RGB node labeled 'Color' not found.")
+
+    # Set the color
+    color_node.outputs[0].default_value = tuple(color)
+
+
 class ZendoObject:
     instances = []
     poses = {}
 
     def __init__(self, args, idx: int, shape: str, color: str, pose: str = "upright"):
         """
-        Initializes a ZendoObject instance by loading a Blender object with specific shape, color, and pose.
+        Initializes a ZendoObject instance by creating a Blender object from the shared
+        prototype mesh for the given shape and color.
 
         :param args: Configuration arguments including paths to resources.
         :param idx: Unique identifier for the object.
@@ -27,22 +139,27 @@ class ZendoObject:
         ZendoObject.instances.append(self)
         object_shapes, object_colors, object_sizes = utils.read_properties_json(args.properties_json)
         color_code = object_colors[color]
-        # Load object from file
-        filename = os.path.join(args.shape_dir, '%s.blend' % shape.lower(), 'Object', shape)
-        bpy.ops.wm.append(filename=filename)
-        # Rename and set object
-        # self.name = '%s_%d' % (name, get_object_count(name))
+        # Create the object as a linked duplicate of the prototype mesh, reusing
+        # a released object of the same shape and color when one is available
         unique_name = f"{idx}_{shape}"
-        bpy.data.objects[shape].name = unique_name
-        self.obj = bpy.data.objects[unique_name]
-        self.material = self.obj.data.materials[0]
+        mesh = get_prototype_mesh(args, shape, color, color_code)
+        self._proto_key = (shape, color)
+        free = _free_objects.get(self._proto_key)
+        if free:
+            self.obj = free.pop()
+            self.obj.name = unique_name
+        else:
+            self.obj = bpy.data.objects.new(unique_name, mesh)
+        self.material = mesh.materials[0]
 
         self.args = args
         self.shape = shape.lower()
         self.idx = idx
         self.name = unique_name
         self.pose = pose
-        self.set_color(color_code)
+        self._bb_cache = None
+        self._corners_h = None
+        self._rays_local = None
         self.color = color
         self.set_pose(pose)
         self.grounded = True
@@ -68,6 +185,21 @@ class ZendoObject:
         bpy.data.objects.remove(self.obj, do_unlink=True)
         ZendoObject.instances.remove(self)
 
+    def release(self):
+        """
+        Unlinks the Blender object from its collections and returns it to the free
+        list, so a later object of the same shape and color can reuse it instead of
+        allocating a new object datablock.
+        """
+
+        for coll in self.obj.users_collection:
+            coll.objects.unlink(self.obj)
+        # Parked objects stay in bpy.data.objects, so rename them out of the
+        # "<idx>_<shape>" pattern that the scene scans match; reuse restores
+        # a proper name
+        self.obj.name = f"free_{self.obj.name}"
+        _free_objects.setdefault(self._proto_key, []).append(self.obj)
+
     def get_namestring(self):
         """
         Returns a string representation of the object's color, shape, and pose.
@@ -96,6 +228,62 @@ class ZendoObject:
 
         return self.touching
 
+    def invalidate_bounds(self):
+        """
+        Drops the cached world-space bounding box so it is recomputed after the object has been transformed.
+        """
+
+        self._bb_cache = None
+        mark_depsgraph_dirty()
+
+    def get_aabb(self):
+        """
+        Returns the world-space axis-aligned bounding box of the object as NumPy arrays.
+        The box is computed from the eight bound_box corners in a single matrix multiplication
+        and cached until the object is transformed again.
+
+        :return: A tuple (bb_min, bb_max) of float32 arrays of shape (3,).
+        """
+
+        if self._bb_cache is None:
+            ensure_view_layer_updated()
+            if self._corners_h is None:
+                # bound_box is constant in local space, so the homogeneous 4x8 corner
+                # matrix only has to be materialized once per object
+                self._corners_h = np.array([[x, y, z, 1.0] for x, y, z in self.obj.bound_box],
+                                           dtype=np.float32).T
+            matrix = np.asarray(self.obj.matrix_world, dtype=np.float32)
+            world_corners = (matrix @ self._corners_h)[:3].T
+            self._bb_cache = (world_corners.min(axis=0), world_corners.max(axis=0))
+        return self._bb_cache
+
+    def _transform_rays(self, origins_local, directions_local, project: bool):
+        """
+        Transforms cached local-space ray origins and directions to world space in one
+        batched matrix multiplication and normalizes all directions at once.
+
+        :param origins_local: Local-space ray origins as an array of shape (R, 3).
+        :param directions_local: Local-space ray directions as an array of shape (R, 3).
+        :param project: If True, projects the rays onto the XY plane and applies the
+                        ground offset, as needed for flat grounded objects.
+        :return: A list of (origin, direction) Vector tuples.
+        """
+
+        ensure_view_layer_updated()
+        matrix = np.array(self.obj.matrix_world)
+        rotation = matrix[:3, :3]
+        origins_world = origins_local @ rotation.T + matrix[:3, 3]
+        directions_world = directions_local @ rotation.T
+        if project:
+            # Ground offset because raycasting on 0 Z coordinate doesn't work reliably
+            origins_world[:, 2] = 0.01
+            directions_world[:, 2] = 0.0
+        norms = np.linalg.norm(directions_world, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        directions_world /= norms
+        return [(Vector(origin), Vector(direction))
+                for origin, direction in zip(origins_world, directions_world)]
+
     def set_pose(self, pose):
         """
         Sets the pose of the object using a predefined orientation quaternion. Also ensures the object is grounded after the rotation.
@@ -108,7 +296,7 @@ class ZendoObject:
         self.obj.rotation_quaternion = self.__class__.poses[pose]
         self.pose = pose
         self.set_to_ground()
-        bpy.context.view_layer.update()
+        self.invalidate_bounds()
 
     def set_position(self, position: Vector):
         """
@@ -118,6 +306,7 @@ class ZendoObject:
         """
 
         self.obj.location = position
+        self.invalidate_bounds()
 
     def set_position_xy(self, position: Vector):
         """
@@ -128,6 +317,7 @@ class ZendoObject:
 
         self.obj.location.x = position.x
         self.obj.location.y = position.y
+        self.invalidate_bounds()
 
     def get_position(self):
         """
@@ -209,7 +399,7 @@ class ZendoObject:
             )
         self.obj.rotation_quaternion = rotation @ self.obj.rotation_quaternion
         self.set_to_ground()
-        bpy.context.view_layer.update()
+        self.invalidate_bounds()
 
     def set_rotation_quaternion(self, rotation: Quaternion):
         """
@@ -220,6 +410,7 @@ class ZendoObject:
 
         self.obj.rotation_mode = "QUATERNION"
         self.obj.rotation_quaternion = rotation
+        self.invalidate_bounds()
 
     def rotate_z(self, rad: float):
         """
@@ -232,7 +423,7 @@ class ZendoObject:
         rotation = Quaternion(Vector((0, 0, 1)), math.radians(rad))
         self.obj.rotation_quaternion = rotation @ self.obj.rotation_quaternion
         self.set_to_ground()
-        bpy.context.view_layer.update()
+        self.invalidate_bounds()
 
     def move(self, vec: Vector):
         """
@@ -242,37 +433,19 @@ class ZendoObject:
         """
 
         self.obj.location += vec
+        self.invalidate_bounds()
 
     def set_color(self, color: list[float]):
         """
         Sets the object's color by adjusting its material's RGBA node value.
+        The material is shared with all objects of the same shape and color
+        combination, which all change color together.
 
         :param color: A list containing RGBA color values (floats between 0 and 1).
         :raises Exception: If the object's material or RGB node is missing.
         """
 
-        r, g, b, a = color
-        # Check if the material exists and uses nodes
-        if not self.material:
-            raise Exception("No material found.")
-
-        if not self.material.use_nodes:
-            raise Exception(f"Material '{self.material.name}' does not use nodes.")
-
-        nodes = self.material.node_tree.nodes
-
-        # Look for an RGB node labeled "Color"
-        color_node = None
-        for node in nodes:
-            if node.type == 'RGB':  # and (node.label == "Color" or node.name == "Color"):
-                color_node = node
-                break
-
-        if not color_node:
-            raise Exception("RGB node labeled 'Color' not found.")
-
-        # Set the color
-        color_node.outputs[0].default_value = (r, g, b, a)
+        _set_material_color(self.material, color)
 
     def get_world_bounding_box(self):
         """
@@ -281,7 +454,7 @@ class ZendoObject:
         :return: A tuple (min_coords, max_coords) representing the minimum and maximum bounding box corners as Vectors.
         """
 
-        bpy.context.view_layer.update()
+        ensure_view_layer_updated()
 
         # Get the world-space coordinates of the object's vertices
         world_vertices = [self.obj.matrix_world @ mathutils.Vector(v.co) for v in self.obj.data.vertices]
@@ -323,16 +496,13 @@ class Pyramid(ZendoObject):
         :return: A list containing tuples with ray origin and direction vectors.
         """
 
-        mesh = self.obj.data
-        tip = max(mesh.vertices, key=lambda v: v.co.z)  # Highest vertex in local Z
-        if self.pose == 'flat' and self.grounded:
-            origin = project_to_xy(self.obj.matrix_world @ tip.co)
-            origin.z = 0.01  # Ground offset because raycasting on 0 Z coordinate doesn't work reliably
-            direction = project_to_xy(self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1))).normalized()
-        else:
-            origin = self.obj.matrix_world @ tip.co
-            direction = self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1)).normalized()
-        return [(origin, direction)]
+        if self._rays_local is None:
+            mesh = self.obj.data
+            tip = max(mesh.vertices, key=lambda v: v.co.z)  # Highest vertex in local Z
+            self._rays_local = (np.array([tip.co[:]]), np.array([[0.0, 0.0, 1.0]]))
+        origins_local, directions_local = self._rays_local
+        return self._transform_rays(origins_local, directions_local,
+                                    project=self.pose == 'flat' and self.grounded)
 
 
 class Block(ZendoObject):
@@ -362,43 +532,29 @@ class Block(ZendoObject):
         :raises ValueError: If the object does not have enough vertices to interpolate rays.
         """
 
-        mesh = self.obj.data
-        highest_z = max(v.co.z for v in mesh.vertices)
-        top_vertices = [v for v in mesh.vertices if v.co.z == highest_z]
-
-        if len(top_vertices) < 4:
-            raise ValueError("Not enough vertices to interpolate rays.")
-
-        v1_world = self.obj.matrix_world @ top_vertices[0].co
-        v2_world = self.obj.matrix_world @ top_vertices[1].co
-        v3_world = self.obj.matrix_world @ top_vertices[2].co
-        v4_world = self.obj.matrix_world @ top_vertices[3].co
+        if self._rays_local is None:
+            mesh = self.obj.data
+            highest_z = max(v.co.z for v in mesh.vertices)
+            top_vertices = [v for v in mesh.vertices if v.co.z == highest_z]
 
-        rays = []
+            if len(top_vertices) < 4:
+                raise ValueError("Not enough vertices to interpolate rays.")
 
-        # Interpolate within the topmost face
-        for i in range(self.args.ray_interpolation + 2):  # +2 includes the edges
-            t1 = i / (self.args.ray_interpolation + 1)
-            # Interpolate along the two opposite edges
-            edge1_point = v1_world.lerp(v2_world, t1)
-            edge2_point = v4_world.lerp(v3_world, t1)
+            v1, v2, v3, v4 = (np.array(v.co[:]) for v in top_vertices[:4])
 
-            for j in range(self.args.ray_interpolation + 2):
-                t2 = j / (self.args.ray_interpolation + 1)
-                # Interpolate between the two edges to create grid points
-                interpolated_point = edge1_point.lerp(edge2_point, t2)
+            # Interpolate a grid within the topmost face, +2 to include the edges
+            t = np.linspace(0.0, 1.0, self.args.ray_interpolation + 2)
+            edge1_points = v1 + np.outer(t, v2 - v1)
+            edge2_points = v4 + np.outer(t, v3 - v4)
+            grid = edge1_points[:, None, :] + t[None, :, None] * (edge2_points - edge1_points)[:, None, :]
 
-                # Generate ray from the interpolated point
-                origin = interpolated_point
-                direction = self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1)).normalized()
+            origins = np.concatenate([grid.reshape(-1, 3),
+                                      np.array([v.co[:] for v in top_vertices])])
+            directions = np.tile((0.0, 0.0, 1.0), (len(origins), 1))
+            self._rays_local = (origins, directions)
 
-                rays.append((origin, direction))
-
-        for v in top_vertices:
-            origin = self.obj.matrix_world @ v.co
-            direction = self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1)).normalized()
-            rays.append((origin, direction))
-        return rays
+        origins_local, directions_local = self._rays_local
+        return self._transform_rays(origins_local, directions_local, project=False)
 
 
 class Wedge(ZendoObject):
@@ -428,31 +584,89 @@ class Wedge(ZendoObject):
         :raises ValueError: If the object lacks sufficient vertices for ray interpolation.
         """
 
-        mesh = self.obj.data
-        highest_z = max(v.co.z for v in mesh.vertices)
-        top_vertices = [v for v in mesh.vertices if v.co.z == highest_z]
+        if self._rays_local is None:
+            mesh = self.obj.data
+            highest_z = max(v.co.z for v in mesh.vertices)
+            top_vertices = [v for v in mesh.vertices if v.co.z == highest_z]
+
+            if len(top_vertices) < 2:
+                raise ValueError("Not enough vertices to interpolate rays.")
+
+            v1 = np.array(top_vertices[0].co[:])
+            v2 = np.array(top_vertices[1].co[:])
 
-        if len(top_vertices) < 2:
-            raise ValueError("Not enough vertices to interpolate rays.")
+            # Interpolate along the highest edge, +2 to include the start and end points
+            t = np.linspace(0.0, 1.0, self.args.ray_interpolation + 2)
+            origins = v1 + np.outer(t, v2 - v1)
+            directions = np.tile((0.0, 0.0, 1.0), (len(origins), 1))
+            self._rays_local = (origins, directions)
 
-        v1_world = self.obj.matrix_world @ top_vertices[0].co
-        v2_world = self.obj.matrix_world @ top_vertices[1].co
+        origins_local, directions_local = self._rays_local
+        return self._transform_rays(origins_local, directions_local,
+                                    project=self.pose == 'flat' and self.grounded)
 
-        rays = []
-        for i in range(self.args.ray_interpolation + 2):  # +2 includes the start and end points
-            t = i / (self.args.ray_interpolation + 1)  # Interpolation factor (0 to 1)
-            interpolated_point = v1_world.lerp(v2_world, t)  # Linear interpolation
 
-            if self.pose == 'flat' and self.grounded:
-                origin = project_to_xy(interpolated_point)
-                origin.z = 0.01  # Ground offset because raycasting on 0 Z coordinate doesn't work reliably
-                direction = project_to_xy(self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1))).normalized()
-            else:
-                origin = interpolated_point
-                direction = self.obj.matrix_world.to_3x3() @ mathutils.Vector((0, 0, 1)).normalized()
+# Local-space vertex coordinates cached per mesh datablock name, shared by all
+# objects created from the same prototype mesh
+_mesh_vertices = {}
+
+
+def _local_vertices(mesh):
+    """
+    Returns the local-space vertex coordinates of a mesh as a NumPy array,
+    reading them out of Blender only once per mesh datablock.
+
+    :param mesh: The Blender mesh datablock.
+    :return: A float array of shape (V, 3) with the local vertex coordinates.
+    """
+
+    vertices = _mesh_vertices.get(mesh.name)
+    if vertices is None:
+        vertices = np.empty(len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", vertices)
+        vertices = vertices.reshape(-1, 3)
+        _mesh_vertices[mesh.name] = vertices
+    return vertices
+
+
+def world_bounding_boxes(objects):
+    """
+    Computes the world-space bounding boxes and positions of several objects in
+    one pass. The vertex transforms run as batched NumPy matrix products instead
+    of per-vertex mathutils arithmetic, which keeps the ground-truth export off
+    the Python/C boundary while matching get_world_bounding_box exactly.
+
+    :param objects: The ZendoObject instances to measure.
+    :return: A tuple (min_bb, max_bb, positions) of float arrays of shape (N, 3).
+    """
+
+    ensure_view_layer_updated()
+    count = len(objects)
+    min_bb = np.empty((count, 3))
+    max_bb = np.empty((count, 3))
+    positions = np.empty((count, 3))
+    for i, zendo_object in enumerate(objects):
+        matrix = np.array(zendo_object.obj.matrix_world)
+        world = _local_vertices(zendo_object.obj.data) @ matrix[:3, :3].T + matrix[:3, 3]
+        min_bb[i] = world.min(axis=0)
+        max_bb[i] = world.max(axis=0)
+        positions[i] = matrix[:3, 3]
+    return min_bb, max_bb, positions
+
+
+def clear_scene(collection):
+    """
+    Releases all generated objects back into the free list, so the base scene can
+    be reused for the next generation without reopening the blend file and the
+    object datablocks can be recycled instead of removed and recreated.
+
+    :param collection: The Blender collection holding the generated objects.
+    """
 
-            rays.append((origin, direction))
-        return rays
+    for zendo_object in ZendoObject.instances:
+        zendo_object.release()
+    ZendoObject.instances.clear()
+    mark_depsgraph_dirty()
 
 
 def get_object_count(name):